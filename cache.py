@@ -2,7 +2,10 @@
 Redis async caching utilities.
 
 Usage:
-    from cache import cache_response, invalidate_prefix, get_redis
+    from cache import cache_response, invalidate_prefix, init_cache
+
+    # Once, at app startup:
+    await init_cache()
 
     # Cache a route for 5 minutes:
     @app.get("/api/stats")
@@ -12,56 +15,129 @@ Usage:
 
     # Bust all stats caches after a write:
     await invalidate_prefix("stats")
+
+    # Or several prefixes in one round trip:
+    await invalidate_prefixes(["stats", "analytics"])
 """
 
 import os
-import json
-import hashlib
+import asyncio
 import functools
-from typing import Any, Callable, Optional
+import inspect
+import logging
+import random
+import time
+import weakref
+from typing import Any, Callable, Optional, Union
 
+import cachetools
+import msgspec
 import redis.asyncio as aioredis
-import time
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+import xxhash
+import zstandard as zstd
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
-# Single shared connection pool — created once on first use.
-_redis_pool: Optional[aioredis.Redis] = None
-# Timestamp of last failure to connect to Redis. Used to fast-fail subsequent
-# cache attempts for a short cooldown window to avoid repeatedly waiting on
-# socket timeouts when Redis is down or unreachable.
+logger = logging.getLogger(__name__)
+
+
+def _enc_hook(obj: Any) -> Any:
+    # Pydantic models (e.g. ProfileListResponse) are dumped to plain dicts;
+    # anything else msgpack can't represent falls back to str(), mirroring the
+    # old json.dumps(..., default=str) behaviour.
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return str(obj)
+
+
+# msgpack codec — built once at import, reused by every cache_get/cache_set.
+_ENC = msgspec.msgpack.Encoder(enc_hook=_enc_hook)
+_DEC = msgspec.msgpack.Decoder()
+# Cache-key encoder: packs endpoint parameter values for hashing.
+_KEY_ENC = msgspec.msgpack.Encoder(enc_hook=str)
+
+# Values above this size are zstd-compressed before SETEX. Every stored blob
+# carries a one-byte tag: b"Z" = compressed, b"R" = raw msgpack.
+_COMPRESS_MIN_BYTES = 1024
+_ZSTD = zstd.ZstdCompressor(level=1)
+_UNZSTD = zstd.ZstdDecompressor()
+
+
+def _pack(value: Any) -> bytes:
+    blob = _ENC.encode(value)
+    if len(blob) > _COMPRESS_MIN_BYTES:
+        return b"Z" + _ZSTD.compress(blob)
+    return b"R" + blob
+
+
+def _unpack(raw: bytes) -> Any:
+    body = memoryview(raw)[1:]
+    if raw[:1] == b"Z":
+        body = _UNZSTD.decompress(body)
+    return _DEC.decode(body)
+
+
+# Monotonic timestamp of the last failure to reach Redis. Used to fast-fail
+# subsequent cache attempts for a short cooldown window to avoid repeatedly
+# waiting on socket timeouts when Redis is down or unreachable.
 _last_failed: float = 0.0
 # Cooldown (seconds) after a failure during which cache calls will immediately
-# return a miss instead of attempting to reconnect.
+# return a miss instead of attempting to reconnect. Each failure picks a
+# jittered window in [_FAIL_COOLDOWN, 2 × _FAIL_COOLDOWN) so workers don't all
+# retry a recovering Redis at the same instant.
 _FAIL_COOLDOWN = 10.0
+_cooldown: float = _FAIL_COOLDOWN
+
+
+def _mark_failed() -> None:
+    global _last_failed, _cooldown
+    _last_failed = time.monotonic()
+    _cooldown = _FAIL_COOLDOWN * (1.0 + random.random())
+
+
+def _note_error(exc: Exception) -> None:
+    """Start the cooldown if `exc` means Redis is unreachable (not a bad payload)."""
+    if isinstance(exc, (RedisConnectionError, RedisTimeoutError, OSError)):
+        _mark_failed()
+
+
+# Single shared connection pool — built once by init_cache() at app startup.
+# Nothing is created lazily, so concurrent first requests can't race to build
+# duplicate pools.
+_redis_pool: Optional[aioredis.Redis] = None
 
 
-async def get_redis() -> aioredis.Redis:
+async def init_cache() -> None:
+    """Build the Redis pool and warm one connection. Call once from app startup."""
     global _redis_pool
-    # If we recently failed to connect, skip attempting again for a short
-    # cooldown window — this prevents each incoming request from waiting
-    # on a socket timeout when Redis is down.
-    if _redis_pool is None and (_last_failed and (time.time() - _last_failed) < _FAIL_COOLDOWN):
-        return None
+    _redis_pool = aioredis.from_url(
+        REDIS_URL,
+        # Raw bytes in/out — msgpack payloads are binary.
+        max_connections=20,
+        # Short enough to fail fast, long enough to sit above normal
+        # intra-DC Redis tail latency.
+        socket_connect_timeout=0.25,
+        socket_timeout=0.25,
+    )
+    _init_writer()
+    try:
+        # Pay the connect cost now rather than on the first real request.
+        await _redis_pool.ping()
+    except Exception:
+        # Keep the pool — Redis may come up later — but start in cooldown so
+        # early requests don't each wait on a connect timeout.
+        logger.warning("init_cache: Redis unreachable at startup; caching disabled for now")
+        _mark_failed()
 
-    if _redis_pool is None:
-        try:
-            _redis_pool = aioredis.from_url(
-                REDIS_URL,
-                encoding="utf-8",
-                decode_responses=True,
-                max_connections=20,
-                socket_connect_timeout=0.01,   # keep it snappy
-                socket_timeout=0.01,
-            )
-            return _redis_pool
-        except Exception:
-            # Record failure time and return None so callers treat this as
-            # a cache miss without blocking.
-            nonlocal_flag = globals()
-            nonlocal_flag['_last_failed'] = time.time()
-            return None
 
+def get_redis() -> Optional[aioredis.Redis]:
+    """Return the shared client, or None while in the post-failure cooldown."""
+    # If we recently failed to reach Redis, skip it for a short cooldown
+    # window — this prevents each incoming request from waiting on a socket
+    # timeout when Redis is down.
+    if _last_failed and (time.monotonic() - _last_failed) < _cooldown:
+        return None
     return _redis_pool
 
 
@@ -70,51 +146,402 @@ async def get_redis() -> aioredis.Redis:
 #    falls back to no-cache mode and continues serving requests normally.
 # ─────────────────────────────────────────────────────────────────────────────
 
-async def cache_get(key: str) -> Optional[Any]:
+# ── Prefix tags ───────────────────────────────────────────────────────────────
+# Every cached key is also added to a Redis set `prefix_tag:<prefix>`, so
+# invalidating a prefix is O(members) instead of a SCAN over the keyspace.
+# The tag's TTL is refreshed on every add; it only needs to outlive the
+# longest-lived member it tracks.
+_TAG_TTL = 24 * 3600
+
+# Atomically UNLINK every member of each tag set, then drop the tags. Running
+# it as one script means a key tagged mid-invalidation can't be orphaned.
+_INVALIDATE_LUA = """
+local n = 0
+for _, tag in ipairs(KEYS) do
+    local members = redis.call('SMEMBERS', tag)
+    for i = 1, #members, 500 do
+        n = n + redis.call('UNLINK', unpack(members, i, math.min(i + 499, #members)))
+    end
+    redis.call('DEL', tag)
+end
+return n
+"""
+
+
+def _tag_key(key: Union[str, bytes]) -> Union[str, bytes]:
+    if isinstance(key, bytes):
+        return b"prefix_tag:" + key.partition(b":")[0]
+    return "prefix_tag:" + key.partition(":")[0]
+
+
+def _l1_of_key(key: Union[str, bytes]) -> Optional[cachetools.TTLCache]:
+    if isinstance(key, bytes):
+        return _L1.get(key.partition(b":")[0].decode())
+    return _L1.get(key.partition(":")[0])
+
+
+async def cache_get(key: Union[str, bytes]) -> Optional[Any]:
+    l1 = _l1_of_key(key) if _L1 else None
+    if l1 is not None:
+        value = l1.get(key)
+        if value is not None:
+            return value
     try:
-        r = await get_redis()
+        r = get_redis()
         if r is None:
             return None
         raw = await r.get(key)
         if raw is None:
             return None
-        return json.loads(raw)
-    except Exception:
+        value = _unpack(raw)
+        if l1 is not None:
+            l1[key] = value
+        return value
+    except Exception as exc:
+        _note_error(exc)
         # Redis unavailable — treat as a cache miss; caller fetches from DB.
         return None
 
 
 async def cache_set(key: str, value: Any, ttl: int = 300) -> None:
+    l1 = _l1_of_key(key) if _L1 else None
+    if l1 is not None:
+        l1[key] = value
+    await cache_set_many([(key, _pack(value), ttl)])
+
+
+async def cache_mget(keys: list[str]) -> list[Optional[Any]]:
+    """Fetch several keys in one MGET round trip. Misses come back as None."""
+    if not keys:
+        return []
+    try:
+        r = get_redis()
+        if r is None:
+            return [None] * len(keys)
+        return [None if raw is None else _unpack(raw) for raw in await r.mget(keys)]
+    except Exception as exc:
+        _note_error(exc)
+        return [None] * len(keys)
+
+
+async def cache_set_many(items: list[tuple[Union[str, bytes], bytes, int]]) -> None:
+    """SETEX several pre-encoded `(key, blob, ttl)` entries in one pipelined round trip."""
+    if not items:
+        return
     try:
-        r = await get_redis()
+        r = get_redis()
         if r is None:
             return
-        await r.setex(key, ttl, json.dumps(value, default=str))
+        if _tracking_redirect is None:
+            await _setex_tagged(r, items)
+            return
+        # L1 keys go through the NOLOOP tracking connection, so these writes
+        # don't come back as invalidations of the L1 entries they mirror.
+        # The rest don't need to queue behind it.
+        tracked = [item for item in items if _l1_of_key(item[0]) is not None]
+        untracked = [item for item in items if _l1_of_key(item[0]) is None]
+        await asyncio.gather(_setex_tagged(_writer, tracked), _setex_tagged(r, untracked))
+    except Exception as exc:
+        _note_error(exc)  # Best-effort — skip caching when Redis is down.
+
+
+async def _setex_tagged(r: aioredis.Redis, items: list[tuple[Union[str, bytes], bytes, int]]) -> None:
+    if not items:
+        return
+    async with r.pipeline(transaction=False) as pipe:
+        for key, blob, ttl in items:
+            tag = _tag_key(key)
+            pipe.setex(key, ttl, blob)
+            # Register the key under its prefix tag so invalidation never
+            # has to scan the keyspace.
+            pipe.sadd(tag, key)
+            pipe.expire(tag, _TAG_TTL)
+        await pipe.execute()
+
+
+# Write-behind buffer for cache_response: writes queued during one event-loop
+# tick are flushed together in a single pipeline, off the response path.
+_pending_sets: list[tuple[Union[str, bytes], bytes, int]] = []
+# Upper bound on queued writes. If Redis is slow and the buffer fills, extra
+# writes are dropped — a skipped cache fill is cheaper than unbounded memory.
+_MAX_PENDING_SETS = 256
+_flush_task: Optional[asyncio.Task] = None
+# Strong refs to in-flight background tasks so they aren't GC'd mid-write.
+_bg_tasks: set[asyncio.Task] = set()
+
+
+async def _flush_pending_sets() -> None:
+    global _flush_task
+    try:
+        # Single flusher: writes queued while a pipeline is in flight are
+        # picked up by the next loop iteration rather than a new task.
+        while _pending_sets:
+            # Yield once so every handler finishing in this tick can enqueue first.
+            await asyncio.sleep(0)
+            batch = _pending_sets[:]
+            _pending_sets.clear()
+            await cache_set_many(batch)
+    finally:
+        _flush_task = None
+
+
+def schedule_cache_set(key: Union[str, bytes], value: Any, ttl: int = 300) -> None:
+    """Fire-and-forget cache write; the caller never waits on Redis."""
+    global _flush_task
+    if len(_pending_sets) >= _MAX_PENDING_SETS:
+        return
+    try:
+        # Encode now so later mutation of `value` can't leak into the cache.
+        _pending_sets.append((key, _pack(value), ttl))
     except Exception:
-        pass  # Best-effort — skip caching when Redis is down.
+        return
+    if _flush_task is None:
+        _flush_task = asyncio.create_task(_flush_pending_sets())
+        _bg_tasks.add(_flush_task)
+        _flush_task.add_done_callback(_bg_tasks.discard)
 
 
-async def invalidate_prefix(prefix: str) -> int:
-    """Delete all Redis keys that start with `prefix:`. Returns count deleted."""
+# ── L1: in-process cache in front of Redis ────────────────────────────────────
+# One TTLCache per cache_response / use_l1 prefix so invalidation can drop a
+# whole prefix in O(1). L1 entries live at most _L1_MAX_TTL seconds (or the
+# prefix's own ttl if shorter) to bound cross-worker staleness.
+_L1_MAXSIZE = 4096
+_L1_MAX_TTL = 60
+_L1: dict[str, cachetools.TTLCache] = {}
+# Pub/sub channel used to tell every worker to drop its L1 for a prefix.
+_INVALIDATE_CHANNEL = "cache:invalidate"
+# Channel Redis publishes client-tracking invalidations on (RESP2 redirect mode).
+_TRACKING_CHANNEL = "__redis__:invalidate"
+_TRACKING_CHANNEL_B = _TRACKING_CHANNEL.encode()
+_l1_listener: Optional[asyncio.Task] = None
+
+
+def _l1_for(prefix: str, ttl: int) -> cachetools.TTLCache:
+    l1 = _L1.get(prefix)
+    if l1 is None:
+        l1 = _L1[prefix] = cachetools.TTLCache(maxsize=_L1_MAXSIZE, ttl=min(ttl, _L1_MAX_TTL))
+    return l1
+
+
+def use_l1(prefix: str, ttl: int) -> None:
+    """
+    Put an L1 in front of cache_get/cache_set for keys under `prefix:`.
+    Call at import time, before start_l1_listener(), so the prefix is
+    included in Redis client tracking.
+    """
+    _l1_for(prefix, ttl)
+
+
+def _l1_drop(prefix: str) -> None:
+    l1 = _L1.get(prefix)
+    if l1 is not None:
+        l1.clear()
+
+
+def _l1_drop_keys(keys: Optional[list]) -> None:
+    """Handle a server-assisted tracking message: drop just the changed keys."""
+    if keys is None:
+        # FLUSHDB / FLUSHALL — everything is stale.
+        for l1 in _L1.values():
+            l1.clear()
+        return
+    for key in keys:
+        l1 = _l1_of_key(key)
+        if l1 is not None:
+            # cache_response keys are binary; cache_get/cache_set keys are str.
+            l1.pop(key, None)
+            l1.pop(key.decode("utf-8", "replace"), None)
+
+
+# Writer for L1-backed cache fills. While the L1 listener runs, client
+# tracking is on for this connection with NOLOOP: Redis then reports other
+# clients' changes to L1 keys but not this worker's own SETEXes, which would
+# otherwise drop the L1 entry cache_set / cache_response just stored. NOLOOP
+# only covers the connection's own writes — a second tracking connection
+# would be notified of the first one's — so the pool holds exactly one, and
+# only L1 keys are written through it (see cache_set_many).
+_writer: Optional[aioredis.Redis] = None
+# Client id of the listener's pub/sub connection while tracking is on.
+_tracking_redirect: Optional[int] = None
+# Redirect each writer connection's tracking currently points at (absent = off).
+_tracked: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+class _WriterPool(aioredis.BlockingConnectionPool):
+    """Hands out the writer connection with tracking matching _tracking_redirect."""
+
+    async def get_connection(self, *args, **kwargs):
+        conn = await super().get_connection(*args, **kwargs)
+        if _tracked.get(conn) != _tracking_redirect:
+            try:
+                await _apply_tracking(conn)
+            except BaseException:
+                await self.release(conn)
+                raise
+        return conn
+
+
+def _init_writer() -> None:
+    global _writer
+    _writer = aioredis.Redis(connection_pool=_WriterPool.from_url(
+        REDIS_URL,
+        max_connections=1,
+        timeout=1.0,
+        socket_connect_timeout=0.25,
+        socket_timeout=0.25,
+        redis_connect_func=_on_writer_connect,
+    ))
+
+
+async def _on_writer_connect(conn) -> None:
+    await conn.on_connect()
+    # A fresh socket starts untracked; _WriterPool re-applies tracking.
+    _tracked.pop(conn, None)
+
+
+async def _apply_tracking(conn) -> None:
+    redirect_id = _tracking_redirect
+    if conn in _tracked:
+        # Redis won't re-register BCAST prefixes on a tracking connection.
+        await conn.send_command("CLIENT", "TRACKING", "OFF")
+        await conn.read_response()
+        del _tracked[conn]
+    if redirect_id is not None:
+        args = ["CLIENT", "TRACKING", "ON", "REDIRECT", redirect_id, "BCAST", "NOLOOP"]
+        for prefix in _L1:
+            args += ["PREFIX", f"{prefix}:"]
+        await conn.send_command(*args)
+        await conn.read_response()
+        _tracked[conn] = redirect_id
+
+
+async def _set_tracking(redirect_id: Optional[int]) -> bool:
+    """
+    Turn Redis server-assisted client-side caching (Redis 6+) on for the
+    writer, in broadcast mode for every L1 prefix, redirecting invalidations
+    to `redirect_id` — or off, for None. Returns whether tracking is now on
+    (False too if the server doesn't support it).
+    """
+    global _tracking_redirect
+    if redirect_id is not None and (_writer is None or not _L1):
+        return False
+    # The writer connection picks the new setting up the next time it is
+    # checked out — nothing in flight is torn down.
+    _tracking_redirect = redirect_id
+    if redirect_id is None:
+        return False
     try:
-        r = await get_redis()
+        # Applies it now, and finds out whether the server supports it.
+        await _writer.ping()
+        return True
+    except Exception:
+        _tracking_redirect = None
+        return False
+
+
+async def _listen_for_invalidations() -> None:
+    """Drop local L1 entries whenever any worker invalidates a prefix."""
+    while True:
+        tracking = False
+        r = get_redis()
+        try:
+            if r is None:
+                await asyncio.sleep(_FAIL_COOLDOWN)
+                continue
+            async with r.pubsub() as ps:
+                # Grab our own client id before entering subscribe mode, so
+                # Redis can redirect tracking invalidations to this connection.
+                await ps.connect()
+                await ps.connection.send_command("CLIENT", "ID")
+                redirect_id = await ps.connection.read_response()
+                await ps.subscribe(_INVALIDATE_CHANNEL, _TRACKING_CHANNEL)
+                tracking = await _set_tracking(redirect_id)
+                while True:
+                    # Explicit timeout — the pool's socket_timeout is far too
+                    # short for an idle subscriber.
+                    msg = await ps.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if msg is None:
+                        continue
+                    if msg["channel"] == _TRACKING_CHANNEL_B:
+                        _l1_drop_keys(msg["data"])
+                    else:
+                        _l1_drop(msg["data"].decode())
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Lost the subscription — while we're deaf, L1 TTLs bound staleness.
+            logger.debug("L1 invalidation listener disconnected", exc_info=True)
+            await asyncio.sleep(_FAIL_COOLDOWN)
+        finally:
+            if tracking:
+                # Invalidations can no longer reach us; stop routing writes
+                # through the tracking connection.
+                await _set_tracking(None)
+
+
+def start_l1_listener() -> None:
+    """Start the L1 invalidation subscriber. Call once from app startup."""
+    global _l1_listener
+    if _l1_listener is None:
+        _l1_listener = asyncio.create_task(_listen_for_invalidations())
+
+
+async def invalidate_prefixes(prefixes: list[str]) -> int:
+    """
+    Delete all cached keys under each of `prefixes`, using the prefix tag
+    sets. The pub/sub notifications and the UNLINK script go out in one
+    pipelined round trip. Returns count deleted.
+    """
+    for prefix in prefixes:
+        _l1_drop(prefix)
+    try:
+        r = get_redis()
         if r is None:
             return 0
-        keys = await r.keys(f"{prefix}:*")
-        if keys:
-            return await r.delete(*keys)
-        return 0
-    except Exception:
+        async with r.pipeline(transaction=False) as pipe:
+            for prefix in prefixes:
+                pipe.publish(_INVALIDATE_CHANNEL, prefix)
+            pipe.eval(_INVALIDATE_LUA, len(prefixes), *[f"prefix_tag:{p}" for p in prefixes])
+            results = await pipe.execute()
+        return results[-1]
+    except Exception as exc:
+        _note_error(exc)
         # Redis unavailable — stale entries will expire on their own TTL.
         return 0
 
 
-def _make_cache_key(prefix: str, kwargs: dict) -> str:
-    """Build a deterministic cache key from a prefix + the endpoint's query params."""
-    # Sort for determinism, then hash to keep key length bounded.
-    payload = json.dumps(kwargs, sort_keys=True, default=str)
-    digest = hashlib.sha256(payload.encode()).hexdigest()[:16]
-    return f"{prefix}:{digest}"
+async def invalidate_prefix(prefix: str) -> int:
+    """Delete all Redis keys that start with `prefix:`. Returns count deleted."""
+    return await invalidate_prefixes([prefix])
+
+
+# Single-flight registry: cache key -> future of the one in-flight computation.
+# Concurrent misses on the same key await the leader instead of all hitting
+# the DB (thundering herd on expiry).
+_inflight: dict[bytes, asyncio.Future] = {}
+
+
+# FastAPI-injected dependencies that must never influence the cache key.
+_NON_KEY_PARAMS = frozenset(("db", "request", "background_tasks"))
+
+
+def _make_key_builder(prefix: str, func: Callable) -> Callable[[dict], bytes]:
+    """
+    Specialise the cache-key builder for `func` at decoration time.
+    The cacheable parameter names are fixed by the signature, so each request
+    only packs their values, in signature order, as one msgpack array — no
+    dict filtering, no sorting, no key strings in the hashed payload.
+    Keys are binary (`prefix:` + 8 raw digest bytes): Redis keys are
+    binary-safe, and this is half the size of a hex suffix.
+    """
+    params = tuple(p for p in inspect.signature(func).parameters if p not in _NON_KEY_PARAMS)
+    head = f"{prefix}:".encode()
+
+    def build_key(kwargs: dict) -> bytes:
+        # Non-cryptographic hash — we only need per-prefix uniqueness, not security.
+        return head + xxhash.xxh3_64_digest(_KEY_ENC.encode([kwargs.get(p) for p in params]))
+
+    return build_key
 
 
 def cache_response(prefix: str, ttl: int = 300):
@@ -130,21 +557,49 @@ def cache_response(prefix: str, ttl: int = 300):
             ...
     """
     def decorator(func: Callable):
+        l1 = _l1_for(prefix, ttl)
+        build_key = _make_key_builder(prefix, func)
+
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
-            # Strip FastAPI injected dependencies (db, request) from cache key.
-            cache_kwargs = {
-                k: v for k, v in kwargs.items()
-                if k not in ("db", "request", "background_tasks")
-            }
-            key = _make_cache_key(prefix, cache_kwargs)
+            key = build_key(kwargs)
+
+            cached = l1.get(key)
+            if cached is not None:
+                return cached
 
             cached = await cache_get(key)
             if cached is not None:
+                l1[key] = cached
                 return cached
 
-            result = await func(*args, **kwargs)
-            await cache_set(key, result, ttl=ttl)
+            fut = _inflight.get(key)
+            if fut is not None:
+                try:
+                    return await asyncio.shield(fut)
+                except asyncio.CancelledError:
+                    # Only swallow the leader's cancellation — then compute
+                    # it ourselves below. Our own cancellation propagates.
+                    if not fut.cancelled():
+                        raise
+
+            fut = asyncio.get_running_loop().create_future()
+            _inflight[key] = fut
+            try:
+                result = await func(*args, **kwargs)
+                fut.set_result(result)
+            except Exception as exc:
+                fut.set_exception(exc)
+                fut.exception()  # mark retrieved — there may be no waiters
+                raise
+            finally:
+                _inflight.pop(key, None)
+                if not fut.done():
+                    fut.cancel()
+
+            l1[key] = result
+            # Don't hold the response on the Redis write.
+            schedule_cache_set(key, result, ttl=ttl)
             return result
 
         return wrapper
@@ -152,10 +607,19 @@ def cache_response(prefix: str, ttl: int = 300):
 
 
 async def close_redis() -> None:
-    global _redis_pool
+    global _redis_pool, _writer, _l1_listener
+    if _l1_listener is not None:
+        _l1_listener.cancel()
+        _l1_listener = None
     if _redis_pool:
         try:
             await _redis_pool.aclose()
         except Exception:
             pass
-        _redis_pool = None
\ No newline at end of file
+        _redis_pool = None
+    if _writer:
+        try:
+            await _writer.aclose()
+        except Exception:
+            pass
+        _writer = None
\ No newline at end of file
@@ -52,7 +52,10 @@ def do_run_migrations(connection):
 
 async def run_migrations_online() -> None:
     engine = create_async_engine(DATABASE_URL)
-    async with engine.begin() as conn:
+    # connect(), not begin(): alembic manages the transactions itself, and
+    # autocommit_block() (CREATE INDEX CONCURRENTLY, VALIDATE CONSTRAINT)
+    # can't step out of one opened here.
+    async with engine.connect() as conn:
         await conn.run_sync(do_run_migrations)
     await engine.dispose()
 
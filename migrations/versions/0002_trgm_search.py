@@ -0,0 +1,44 @@
+"""Trigram GIN indexes for ILIKE '%term%' search
+
+Revision ID: 0002_trgm_search
+Revises: 0001_initial
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+
+revision  = "0002_trgm_search"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on    = None
+
+
+# Every column _build_search_filter() matches with ILIKE '%term%'. A leading
+# wildcard rules out B-tree indexes; a pg_trgm GIN index per column lets the
+# planner BitmapOr the eight predicates instead of seq-scanning the table.
+TRGM_COLUMNS = [
+    ("ix_sp_name_trgm",         "name"),
+    ("ix_sp_constituency_trgm", "constituency"),
+    ("ix_sp_designation_trgm",  "designation"),
+    ("ix_sp_zone_trgm",         "zone"),
+    ("ix_sp_email_trgm",        "email_id"),
+    ("ix_sp_fb_id_trgm",        "facebook_id"),
+    ("ix_sp_tw_id_trgm",        "twitter_id"),
+    ("ix_sp_ig_id_trgm",        "instagram_id"),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for idx_name, col in TRGM_COLUMNS:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {idx_name} "
+                f"ON public.social_profiles USING GIN ({col} gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for idx_name, _ in TRGM_COLUMNS:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS public.{idx_name}")
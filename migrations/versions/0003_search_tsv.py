@@ -0,0 +1,44 @@
+"""Generated tsvector column + GIN index for word search
+
+Revision ID: 0003_search_tsv
+Revises: 0002_trgm_search
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+
+revision  = "0003_search_tsv"
+down_revision = "0002_trgm_search"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade() -> None:
+    # 'simple' config: no stemming or stop words — names and places are not
+    # English prose. Must match the Computed() expression in models.py.
+    op.execute(
+        """
+        ALTER TABLE public.social_profiles
+        ADD COLUMN IF NOT EXISTS search_tsv tsvector
+        GENERATED ALWAYS AS (
+            to_tsvector(
+                'simple',
+                coalesce(name,         '') || ' ' ||
+                coalesce(constituency, '') || ' ' ||
+                coalesce(designation,  '') || ' ' ||
+                coalesce(zone,         '')
+            )
+        ) STORED
+        """
+    )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sp_search_tsv "
+            "ON public.social_profiles USING GIN (search_tsv)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS public.ix_sp_search_tsv")
+    op.execute("ALTER TABLE public.social_profiles DROP COLUMN IF EXISTS search_tsv")
@@ -0,0 +1,70 @@
+"""(sort column, id) keyset indexes + partial active/verified indexes
+
+Revision ID: 0004_keyset_indexes
+Revises: 0003_search_tsv
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+
+revision  = "0004_keyset_indexes"
+down_revision = "0003_search_tsv"
+branch_labels = None
+depends_on    = None
+
+
+# One per SORTABLE column (id has the primary key). Each leads with the
+# column of a single-column index from 0001, which becomes redundant
+# (name had none).
+KEYSET_INDEXES = [
+    ("ix_sp_name_id",           "name",                None),
+    ("ix_sp_zone_id",           "zone",                "ix_sp_zone"),
+    ("ix_sp_party_district_id", "party_district",      "ix_sp_party_district"),
+    ("ix_sp_constituency_id",   "constituency",        "ix_sp_constituency"),
+    ("ix_sp_designation_id",    "designation",         "ix_sp_designation"),
+    ("ix_sp_fb_followers_id",   "facebook_followers",  "ix_sp_fb_followers"),
+    ("ix_sp_tw_followers_id",   "twitter_followers",   "ix_sp_tw_followers"),
+    ("ix_sp_ig_followers_id",   "instagram_followers", "ix_sp_ig_followers"),
+]
+
+# Must match the OR emitted by _apply_filters() for active_only / verified_only.
+PARTIAL_INDEXES = [
+    ("ix_sp_any_active",
+     "facebook_active_status = true OR twitter_active_status = true "
+     "OR instagram_active_status = true"),
+    ("ix_sp_any_verified",
+     "facebook_verified_status = true OR twitter_verified_status = true "
+     "OR instagram_verified_status = true"),
+]
+
+
+def upgrade() -> None:
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for idx_name, col, _ in KEYSET_INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {idx_name} "
+                f"ON public.social_profiles ({col}, id)"
+            )
+        for idx_name, where in PARTIAL_INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {idx_name} "
+                f"ON public.social_profiles (id) WHERE {where}"
+            )
+        # Only drop the old indexes once their replacements exist.
+        for _, _, old_name in KEYSET_INDEXES:
+            if old_name:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS public.{old_name}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for _, col, old_name in KEYSET_INDEXES:
+            if old_name:
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {old_name} "
+                    f"ON public.social_profiles ({col})"
+                )
+        for idx_name, _ in PARTIAL_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS public.{idx_name}")
+        for idx_name, _, _ in KEYSET_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS public.{idx_name}")
@@ -0,0 +1,61 @@
+"""Materialized views behind the global /api/stats
+
+Revision ID: 0005_stats_matviews
+Revises: 0004_keyset_indexes
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+
+revision  = "0005_stats_matviews"
+down_revision = "0004_keyset_indexes"
+branch_labels = None
+depends_on    = None
+
+
+# Column names match the labels stats() reads. Each view has a unique index
+# so the app can REFRESH ... CONCURRENTLY without blocking readers.
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW public.mv_profile_stats AS
+        SELECT
+            1                                                       AS id,
+            count(*)                                                AS total,
+            count(*) FILTER (WHERE facebook_active_status)          AS fb_active,
+            count(*) FILTER (WHERE facebook_verified_status)        AS fb_verified,
+            coalesce(sum(facebook_followers), 0)                    AS fb_followers,
+            count(*) FILTER (WHERE twitter_active_status)           AS tw_active,
+            count(*) FILTER (WHERE twitter_verified_status)         AS tw_verified,
+            coalesce(sum(twitter_followers), 0)                     AS tw_followers,
+            count(*) FILTER (WHERE instagram_active_status)         AS ig_active,
+            count(*) FILTER (WHERE instagram_verified_status)       AS ig_verified,
+            coalesce(sum(instagram_followers), 0)                   AS ig_followers
+        FROM public.social_profiles
+        """
+    )
+    op.execute("CREATE UNIQUE INDEX ux_mv_profile_stats ON public.mv_profile_stats (id)")
+
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW public.mv_stats_by_zone AS
+        SELECT zone, count(*) AS c FROM public.social_profiles GROUP BY zone
+        """
+    )
+    op.execute("CREATE UNIQUE INDEX ux_mv_stats_by_zone ON public.mv_stats_by_zone (zone)")
+
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW public.mv_stats_by_designation AS
+        SELECT designation, count(*) AS c FROM public.social_profiles GROUP BY designation
+        """
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX ux_mv_stats_by_designation "
+        "ON public.mv_stats_by_designation (designation)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS public.mv_stats_by_designation")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS public.mv_stats_by_zone")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS public.mv_profile_stats")
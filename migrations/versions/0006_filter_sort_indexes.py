@@ -0,0 +1,39 @@
+"""(filter column, followers, id) indexes for filtered follower sorts
+
+Revision ID: 0006_filter_sort_indexes
+Revises: 0005_stats_matviews
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+
+revision  = "0006_filter_sort_indexes"
+down_revision = "0005_stats_matviews"
+branch_labels = None
+depends_on    = None
+
+
+# zone=? / designation=? listings sorted by a follower count. The equality
+# column leads, so the (followers, id) keyset range is a contiguous slice of
+# the index — read in order, no sort — in either direction.
+FILTER_SORT_INDEXES = [
+    ("ix_sp_zone_fb_followers_id",        "zone",        "facebook_followers"),
+    ("ix_sp_zone_tw_followers_id",        "zone",        "twitter_followers"),
+    ("ix_sp_zone_ig_followers_id",        "zone",        "instagram_followers"),
+    ("ix_sp_designation_fb_followers_id", "designation", "facebook_followers"),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for idx_name, filter_col, sort_col in FILTER_SORT_INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {idx_name} "
+                f"ON public.social_profiles ({filter_col}, {sort_col}, id)"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for idx_name, _, _ in FILTER_SORT_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS public.{idx_name}")
@@ -0,0 +1,56 @@
+"""Rollup materialized view behind the filtered stats/analytics aggregate
+
+Revision ID: 0007_profile_rollup
+Revises: 0006_filter_sort_indexes
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+
+revision  = "0007_profile_rollup"
+down_revision = "0006_filter_sort_indexes"
+branch_labels = None
+depends_on    = None
+
+
+# One row per combination of the equality filters plus the active_only /
+# verified_only flags, with every measure _full_aggregate() needs pre-summed.
+# any_active / any_verified must match the OR that _apply_filters() emits.
+# *_n count the non-NULL follower values, so averages can be re-derived.
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW public.mv_profile_rollup AS
+        SELECT
+            zone, party_district, constituency, designation,
+            coalesce(facebook_active_status OR twitter_active_status
+                     OR instagram_active_status, false)             AS any_active,
+            coalesce(facebook_verified_status OR twitter_verified_status
+                     OR instagram_verified_status, false)           AS any_verified,
+            count(*)                                                AS c,
+            count(*) FILTER (WHERE facebook_active_status)          AS fb_active,
+            count(*) FILTER (WHERE facebook_verified_status)        AS fb_verified,
+            sum(facebook_followers)                                 AS fb_followers,
+            count(facebook_followers)                               AS fb_n,
+            count(*) FILTER (WHERE twitter_active_status)           AS tw_active,
+            count(*) FILTER (WHERE twitter_verified_status)         AS tw_verified,
+            sum(twitter_followers)                                  AS tw_followers,
+            count(twitter_followers)                                AS tw_n,
+            count(*) FILTER (WHERE instagram_active_status)         AS ig_active,
+            count(*) FILTER (WHERE instagram_verified_status)       AS ig_verified,
+            sum(instagram_followers)                                AS ig_followers,
+            count(instagram_followers)                              AS ig_n,
+            sum(coalesce(facebook_followers, 0) + coalesce(twitter_followers, 0)
+                + coalesce(instagram_followers, 0))                 AS followers
+        FROM public.social_profiles
+        GROUP BY 1, 2, 3, 4, 5, 6
+        """
+    )
+    # Unique over the grouping columns, so it can be refreshed CONCURRENTLY.
+    op.execute(
+        "CREATE UNIQUE INDEX ux_mv_profile_rollup ON public.mv_profile_rollup "
+        "(zone, party_district, constituency, designation, any_active, any_verified)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS public.mv_profile_rollup")
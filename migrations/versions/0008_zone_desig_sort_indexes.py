@@ -0,0 +1,47 @@
+"""(zone, designation, followers, id) and (party_district, designation, ...) indexes
+
+Revision ID: 0008_zone_desig_sort_indexes
+Revises: 0007_profile_rollup
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+
+revision  = "0008_zone_desig_sort_indexes"
+down_revision = "0007_profile_rollup"
+branch_labels = None
+depends_on    = None
+
+
+# Equality columns first, then the sort column, then id for the keyset
+# tie-break: zone=? AND designation=? ORDER BY followers is an in-order range
+# read in either direction. The facebook one leads with (zone, designation),
+# so it replaces ix_sp_zone_designation.
+COMBO_INDEXES = [
+    ("ix_sp_zone_desig_fb_id",     ("zone",           "designation", "facebook_followers")),
+    ("ix_sp_zone_desig_tw_id",     ("zone",           "designation", "twitter_followers")),
+    ("ix_sp_zone_desig_ig_id",     ("zone",           "designation", "instagram_followers")),
+    ("ix_sp_district_desig_fb_id", ("party_district", "designation", "facebook_followers")),
+]
+
+REPLACED = "ix_sp_zone_designation"
+
+
+def upgrade() -> None:
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for idx_name, cols in COMBO_INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {idx_name} "
+                f"ON public.social_profiles ({', '.join(cols)}, id)"
+            )
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS public.{REPLACED}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {REPLACED} "
+            f"ON public.social_profiles (zone, designation)"
+        )
+        for idx_name, _ in COMBO_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS public.{idx_name}")
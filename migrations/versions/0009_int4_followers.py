@@ -0,0 +1,99 @@
+"""Follower counts BIGINT -> INTEGER
+
+Revision ID: 0009_int4_followers
+Revises: 0008_zone_desig_sort_indexes
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision  = "0009_int4_followers"
+down_revision = "0008_zone_desig_sort_indexes"
+branch_labels = None
+depends_on    = None
+
+
+FOLLOWER_COLUMNS = ["facebook_followers", "twitter_followers", "instagram_followers"]
+
+# A column can't change type while a view reads it, so the two views over the
+# follower counts are dropped and recreated around the ALTER. Same
+# definitions as 0005 / 0007, except the per-row follower total is summed as
+# bigint: three int4 counts can add up past 2^31.
+MV_PROFILE_STATS = """
+    CREATE MATERIALIZED VIEW public.mv_profile_stats AS
+    SELECT
+        1                                                       AS id,
+        count(*)                                                AS total,
+        count(*) FILTER (WHERE facebook_active_status)          AS fb_active,
+        count(*) FILTER (WHERE facebook_verified_status)        AS fb_verified,
+        coalesce(sum(facebook_followers), 0)                    AS fb_followers,
+        count(*) FILTER (WHERE twitter_active_status)           AS tw_active,
+        count(*) FILTER (WHERE twitter_verified_status)         AS tw_verified,
+        coalesce(sum(twitter_followers), 0)                     AS tw_followers,
+        count(*) FILTER (WHERE instagram_active_status)         AS ig_active,
+        count(*) FILTER (WHERE instagram_verified_status)       AS ig_verified,
+        coalesce(sum(instagram_followers), 0)                   AS ig_followers
+    FROM public.social_profiles
+"""
+
+MV_PROFILE_ROLLUP = """
+    CREATE MATERIALIZED VIEW public.mv_profile_rollup AS
+    SELECT
+        zone, party_district, constituency, designation,
+        coalesce(facebook_active_status OR twitter_active_status
+                 OR instagram_active_status, false)             AS any_active,
+        coalesce(facebook_verified_status OR twitter_verified_status
+                 OR instagram_verified_status, false)           AS any_verified,
+        count(*)                                                AS c,
+        count(*) FILTER (WHERE facebook_active_status)          AS fb_active,
+        count(*) FILTER (WHERE facebook_verified_status)        AS fb_verified,
+        sum(facebook_followers)                                 AS fb_followers,
+        count(facebook_followers)                               AS fb_n,
+        count(*) FILTER (WHERE twitter_active_status)           AS tw_active,
+        count(*) FILTER (WHERE twitter_verified_status)         AS tw_verified,
+        sum(twitter_followers)                                  AS tw_followers,
+        count(twitter_followers)                                AS tw_n,
+        count(*) FILTER (WHERE instagram_active_status)         AS ig_active,
+        count(*) FILTER (WHERE instagram_verified_status)       AS ig_verified,
+        sum(instagram_followers)                                AS ig_followers,
+        count(instagram_followers)                              AS ig_n,
+        sum(coalesce(facebook_followers, 0)::bigint + coalesce(twitter_followers, 0)
+            + coalesce(instagram_followers, 0))                 AS followers
+    FROM public.social_profiles
+    GROUP BY 1, 2, 3, 4, 5, 6
+"""
+
+
+def _drop_views() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS public.mv_profile_rollup")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS public.mv_profile_stats")
+
+
+def _create_views() -> None:
+    op.execute(MV_PROFILE_STATS)
+    op.execute("CREATE UNIQUE INDEX ux_mv_profile_stats ON public.mv_profile_stats (id)")
+    op.execute(MV_PROFILE_ROLLUP)
+    op.execute(
+        "CREATE UNIQUE INDEX ux_mv_profile_rollup ON public.mv_profile_rollup "
+        "(zone, party_district, constituency, designation, any_active, any_verified)"
+    )
+
+
+def upgrade() -> None:
+    _drop_views()
+    # Rewrites the table and rebuilds every index on these columns, whose
+    # keys shrink from 8 to 4 bytes. Fails (rolling back) if any count is
+    # already above 2^31 - 1.
+    for col in FOLLOWER_COLUMNS:
+        op.alter_column("social_profiles", col, type_=sa.Integer(),
+                        existing_type=sa.BigInteger(), postgresql_using=f"{col}::integer",
+                        schema="public")
+    _create_views()
+
+
+def downgrade() -> None:
+    _drop_views()
+    for col in FOLLOWER_COLUMNS:
+        op.alter_column("social_profiles", col, type_=sa.BigInteger(),
+                        existing_type=sa.Integer(), schema="public")
+    _create_views()
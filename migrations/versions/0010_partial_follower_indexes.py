@@ -0,0 +1,45 @@
+"""(followers, id) partial indexes for active_only / verified_only listings
+
+Revision ID: 0010_partial_follower_indexes
+Revises: 0009_int4_followers
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+
+revision  = "0010_partial_follower_indexes"
+down_revision = "0009_int4_followers"
+branch_labels = None
+depends_on    = None
+
+
+# Must match the OR emitted by _apply_filters() for active_only / verified_only
+# (same predicates as ix_sp_any_active / ix_sp_any_verified in 0004).
+ANY_ACTIVE = ("facebook_active_status = true OR twitter_active_status = true "
+              "OR instagram_active_status = true")
+ANY_VERIFIED = ("facebook_verified_status = true OR twitter_verified_status = true "
+                "OR instagram_verified_status = true")
+
+# active_only / verified_only + ORDER BY followers: the page is read in order
+# from an index holding only the matching rows.
+PARTIAL_INDEXES = [
+    ("ix_sp_active_fb_followers_id",   "facebook_followers",  ANY_ACTIVE),
+    ("ix_sp_active_tw_followers_id",   "twitter_followers",   ANY_ACTIVE),
+    ("ix_sp_active_ig_followers_id",   "instagram_followers", ANY_ACTIVE),
+    ("ix_sp_verified_fb_followers_id", "facebook_followers",  ANY_VERIFIED),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for idx_name, col, where in PARTIAL_INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {idx_name} "
+                f"ON public.social_profiles ({col}, id) WHERE {where}"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for idx_name, _, _ in PARTIAL_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS public.{idx_name}")
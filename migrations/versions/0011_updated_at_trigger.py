@@ -0,0 +1,43 @@
+"""Maintain updated_at with a BEFORE UPDATE trigger
+
+Revision ID: 0011_updated_at_trigger
+Revises: 0010_partial_follower_indexes
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+
+revision  = "0011_updated_at_trigger"
+down_revision = "0010_partial_follower_indexes"
+branch_labels = None
+depends_on    = None
+
+
+# Replaces the model's onupdate=func.now(): the UPDATE statements the app
+# sends no longer carry an updated_at assignment, and writes from outside
+# the ORM (psql, COPY-based fixes) stamp it too.
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION public.set_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at := clock_timestamp();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    # The table may have been bootstrapped by create_all, which installs the
+    # same trigger (see models.py).
+    op.execute("DROP TRIGGER IF EXISTS sp_updated_at ON public.social_profiles")
+    op.execute(
+        """
+        CREATE TRIGGER sp_updated_at
+        BEFORE UPDATE ON public.social_profiles
+        FOR EACH ROW EXECUTE FUNCTION public.set_updated_at()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS sp_updated_at ON public.social_profiles")
+    op.execute("DROP FUNCTION IF EXISTS public.set_updated_at()")
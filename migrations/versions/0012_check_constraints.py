@@ -0,0 +1,43 @@
+"""CHECK constraints: non-negative follower counts, 1-500 char names
+
+Revision ID: 0012_check_constraints
+Revises: 0011_updated_at_trigger
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+
+revision  = "0012_check_constraints"
+down_revision = "0011_updated_at_trigger"
+branch_labels = None
+depends_on    = None
+
+
+# NULLs pass a CHECK, so the nullable columns keep accepting "unknown".
+CHECKS = [
+    ("ck_sp_fb_nonneg", "facebook_followers >= 0"),
+    ("ck_sp_tw_nonneg", "twitter_followers >= 0"),
+    ("ck_sp_ig_nonneg", "instagram_followers >= 0"),
+    ("ck_sp_name_len",  "char_length(name) BETWEEN 1 AND 500"),
+]
+
+
+def upgrade() -> None:
+    # NOT VALID skips the scan of existing rows, so the ACCESS EXCLUSIVE lock
+    # ADD CONSTRAINT takes is brief; new writes are checked right away.
+    for name, expr in CHECKS:
+        op.execute(
+            f"ALTER TABLE public.social_profiles "
+            f"ADD CONSTRAINT {name} CHECK ({expr}) NOT VALID"
+        )
+    # VALIDATE scans the existing rows under SHARE UPDATE EXCLUSIVE, which
+    # doesn't block reads or writes — but only once the ADD above has
+    # committed and released its lock, so it runs in its own transactions.
+    # Fails if a stored row violates a constraint.
+    with op.get_context().autocommit_block():
+        for name, _ in CHECKS:
+            op.execute(f"ALTER TABLE public.social_profiles VALIDATE CONSTRAINT {name}")
+
+
+def downgrade() -> None:
+    for name, _ in CHECKS:
+        op.execute(f"ALTER TABLE public.social_profiles DROP CONSTRAINT IF EXISTS {name}")
@@ -1,68 +1,222 @@
+from datetime import date, datetime
+from typing import Optional
+
 from sqlalchemy import (
-    Column, Integer, BigInteger, String, Text,
-    DateTime, Boolean, Date, Index, func,
+    Integer, String, Text,
+    DateTime, Boolean, Date, CheckConstraint, Index, Computed, DDL, event, func, text,
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column
 from database import Base
 
 
+# The active_only / verified_only predicates exactly as _apply_filters() emits
+# them — partial indexes are only usable when the query's WHERE matches.
+ANY_ACTIVE = text(
+    "facebook_active_status = true OR twitter_active_status = true "
+    "OR instagram_active_status = true")
+ANY_VERIFIED = text(
+    "facebook_verified_status = true OR twitter_verified_status = true "
+    "OR instagram_verified_status = true")
+
+
 class SocialProfile(Base):
     __tablename__ = "social_profiles"
 
     # ── Composite indexes + GIN FTS index ─────────────────────────────────────
     # NOTE: The GIN index (ix_sp_fts) cannot be expressed as a simple column
     # index — it is created by the Alembic migration (see migrations/versions/).
+    # Likewise the pg_trgm GIN indexes (ix_sp_*_trgm) backing the ILIKE
+    # search are created in 0002_trgm_search.
     # All other indexes below are standard B-tree and are auto-created by Alembic.
     __table_args__ = (
-        # Filter indexes — every column used in WHERE clauses gets an index.
-        Index("ix_sp_zone",           "zone"),
-        Index("ix_sp_party_district", "party_district"),
-        Index("ix_sp_constituency",   "constituency"),
-        Index("ix_sp_designation",    "designation"),
-        # Composite index for the most common combined filter pattern.
-        Index("ix_sp_zone_designation", "zone", "designation"),
-        # Follower sort indexes — used by ORDER BY on listing endpoint.
-        Index("ix_sp_fb_followers",  "facebook_followers"),
-        Index("ix_sp_tw_followers",  "twitter_followers"),
-        Index("ix_sp_ig_followers",  "instagram_followers"),
+        # Keyset indexes — one (sort column, id) pair per SORTABLE column, so
+        # list_profiles' ORDER BY col, id + cursor predicate is an index range
+        # scan in either direction. The leading column also serves equality
+        # filters, so these replace the old single-column indexes.
+        Index("ix_sp_name_id",           "name",           "id"),
+        Index("ix_sp_zone_id",           "zone",           "id"),
+        Index("ix_sp_party_district_id", "party_district", "id"),
+        Index("ix_sp_constituency_id",   "constituency",   "id"),
+        Index("ix_sp_designation_id",    "designation",    "id"),
+        Index("ix_sp_fb_followers_id",   "facebook_followers",  "id"),
+        Index("ix_sp_tw_followers_id",   "twitter_followers",   "id"),
+        Index("ix_sp_ig_followers_id",   "instagram_followers", "id"),
+        # Filter-then-sort: zone/designation equality + follower keyset order
+        # read straight off the index (0006_filter_sort_indexes).
+        Index("ix_sp_zone_fb_followers_id",        "zone",        "facebook_followers",  "id"),
+        Index("ix_sp_zone_tw_followers_id",        "zone",        "twitter_followers",   "id"),
+        Index("ix_sp_zone_ig_followers_id",        "zone",        "instagram_followers", "id"),
+        Index("ix_sp_designation_fb_followers_id", "designation", "facebook_followers",  "id"),
+        # Two equality filters + follower sort (0008_zone_desig_sort_indexes).
+        # (zone, designation, ...) also serves the plain zone+designation filter.
+        Index("ix_sp_zone_desig_fb_id",     "zone",           "designation", "facebook_followers",  "id"),
+        Index("ix_sp_zone_desig_tw_id",     "zone",           "designation", "twitter_followers",   "id"),
+        Index("ix_sp_zone_desig_ig_id",     "zone",           "designation", "instagram_followers", "id"),
+        Index("ix_sp_district_desig_fb_id", "party_district", "designation", "facebook_followers",  "id"),
+        # Partial indexes for active_only / verified_only (see ANY_ACTIVE).
+        Index("ix_sp_any_active",   "id", postgresql_where=ANY_ACTIVE),
+        Index("ix_sp_any_verified", "id", postgresql_where=ANY_VERIFIED),
+        # ...and with follower keyset order, for those filters sorted by
+        # followers (0010_partial_follower_indexes).
+        Index("ix_sp_active_fb_followers_id",   "facebook_followers",  "id", postgresql_where=ANY_ACTIVE),
+        Index("ix_sp_active_tw_followers_id",   "twitter_followers",   "id", postgresql_where=ANY_ACTIVE),
+        Index("ix_sp_active_ig_followers_id",   "instagram_followers", "id", postgresql_where=ANY_ACTIVE),
+        Index("ix_sp_verified_fb_followers_id", "facebook_followers",  "id", postgresql_where=ANY_VERIFIED),
+        # GIN index over the generated tsvector used by word search.
+        Index("ix_sp_search_tsv", "search_tsv", postgresql_using="gin"),
+        # Row invariants enforced by Postgres (0012_check_constraints), so the
+        # COPY bulk-create path is held to them too, not just the API schemas.
+        CheckConstraint("facebook_followers >= 0",  name="ck_sp_fb_nonneg"),
+        CheckConstraint("twitter_followers >= 0",   name="ck_sp_tw_nonneg"),
+        CheckConstraint("instagram_followers >= 0", name="ck_sp_ig_nonneg"),
+        CheckConstraint("char_length(name) BETWEEN 1 AND 500", name="ck_sp_name_len"),
+        # Storage: fillfactor=85 and the heap CLUSTERed on ix_sp_zone_desig_fb_id
+        # are set by 0013_cluster_zone_designation (SQLAlchemy has no table
+        # option for either).
         {"schema": "public"},
     )
 
-    id               = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    zone             = Column(String(200))
-    party_district   = Column(String(200))
-    constituency     = Column(String(200))
-    designation      = Column(String(200))
-    name             = Column(String(500))
-    whatsapp_number  = Column(String(50))
+    id:              Mapped[int]           = mapped_column(Integer, primary_key=True, index=True, autoincrement=True)
+    zone:            Mapped[Optional[str]] = mapped_column(String(200))
+    party_district:  Mapped[Optional[str]] = mapped_column(String(200))
+    constituency:    Mapped[Optional[str]] = mapped_column(String(200))
+    designation:     Mapped[Optional[str]] = mapped_column(String(200))
+    name:            Mapped[Optional[str]] = mapped_column(String(500))
+    whatsapp_number: Mapped[Optional[str]] = mapped_column(String(50))
 
     # ── dob: store as a real Date so you can do date arithmetic in SQL ─────────
     # MIGRATION NOTE: if you have existing String data, the Alembic migration
     # casts it with `ALTER COLUMN dob TYPE DATE USING dob::date`.
-    dob              = Column(Date, nullable=True)
+    dob:             Mapped[Optional[date]] = mapped_column(Date, nullable=True)
 
-    address          = Column(Text)
-    email_id         = Column(String(500))
+    address:         Mapped[Optional[str]] = mapped_column(Text)
+    email_id:        Mapped[Optional[str]] = mapped_column(String(500))
 
     # ── Facebook ───────────────────────────────────────────────────────────────
-    facebook_id              = Column(String(500))
-    facebook_followers       = Column(BigInteger, nullable=True)
+    facebook_id:              Mapped[Optional[str]]  = mapped_column(String(500))
+    facebook_followers:       Mapped[Optional[int]]  = mapped_column(Integer, nullable=True)
     # Boolean replaces the old "active"/"inactive" strings:
     #   True  = active,  False = inactive,  None = unknown
-    facebook_active_status   = Column(Boolean, nullable=True)
-    facebook_verified_status = Column(Boolean, nullable=True)
+    facebook_active_status:   Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+    facebook_verified_status: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
 
     # ── Twitter / X ────────────────────────────────────────────────────────────
-    twitter_id               = Column(String(500))
-    twitter_followers        = Column(BigInteger, nullable=True)
-    twitter_active_status    = Column(Boolean, nullable=True)
-    twitter_verified_status  = Column(Boolean, nullable=True)
+    twitter_id:               Mapped[Optional[str]]  = mapped_column(String(500))
+    twitter_followers:        Mapped[Optional[int]]  = mapped_column(Integer, nullable=True)
+    twitter_active_status:    Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+    twitter_verified_status:  Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
 
     # ── Instagram ──────────────────────────────────────────────────────────────
-    instagram_id               = Column(String(500))
-    instagram_followers        = Column(BigInteger, nullable=True)
-    instagram_active_status    = Column(Boolean, nullable=True)
-    instagram_verified_status  = Column(Boolean, nullable=True)
-
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(),
-                        onupdate=func.now(), nullable=False)
+    instagram_id:               Mapped[Optional[str]]  = mapped_column(String(500))
+    instagram_followers:        Mapped[Optional[int]]  = mapped_column(Integer, nullable=True)
+    instagram_active_status:    Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+    instagram_verified_status:  Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+
+    # ── Full-text search ───────────────────────────────────────────────────────
+    # Generated by Postgres from the word-like columns and GIN-indexed
+    # (ix_sp_search_tsv, see 0003_search_tsv). Deferred so listing/export
+    # queries never ship it over the wire.
+    search_tsv: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(constituency, '') "
+            "|| ' ' || coalesce(designation, '') || ' ' || coalesce(zone, ''))",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(),
+                                                 nullable=False)
+    # Bumped on every UPDATE by the sp_updated_at trigger (below and
+    # 0011_updated_at_trigger), not by an onupdate, so UPDATE statements carry
+    # only the patched columns.
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(),
+                                                 nullable=False)
+
+
+# ── Schema objects created alongside the table ──────────────────────────────────
+# Objects the migrations create with raw SQL, attached to the table's
+# after_create so a database bootstrapped by create_all (the app lifespan)
+# gets them too. Keep in step with the latest migration defining each.
+def _after_create(sql: str) -> None:
+    event.listen(SocialProfile.__table__, "after_create",
+                 DDL(sql).execute_if(dialect="postgresql"))
+
+
+# updated_at trigger (0011_updated_at_trigger), rather than a frozen updated_at.
+_after_create("""
+    CREATE OR REPLACE FUNCTION public.set_updated_at() RETURNS trigger AS $$
+    BEGIN
+        NEW.updated_at := clock_timestamp();
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+""")
+_after_create("""
+    CREATE TRIGGER sp_updated_at
+    BEFORE UPDATE ON public.social_profiles
+    FOR EACH ROW EXECUTE FUNCTION public.set_updated_at()
+""")
+
+# Global /api/stats views (0005_stats_matviews, 0009_int4_followers).
+_after_create("""
+    CREATE MATERIALIZED VIEW public.mv_profile_stats AS
+    SELECT
+        1                                                       AS id,
+        count(*)                                                AS total,
+        count(*) FILTER (WHERE facebook_active_status)          AS fb_active,
+        count(*) FILTER (WHERE facebook_verified_status)        AS fb_verified,
+        coalesce(sum(facebook_followers), 0)                    AS fb_followers,
+        count(*) FILTER (WHERE twitter_active_status)           AS tw_active,
+        count(*) FILTER (WHERE twitter_verified_status)         AS tw_verified,
+        coalesce(sum(twitter_followers), 0)                     AS tw_followers,
+        count(*) FILTER (WHERE instagram_active_status)         AS ig_active,
+        count(*) FILTER (WHERE instagram_verified_status)       AS ig_verified,
+        coalesce(sum(instagram_followers), 0)                   AS ig_followers
+    FROM public.social_profiles
+""")
+_after_create("CREATE UNIQUE INDEX ux_mv_profile_stats ON public.mv_profile_stats (id)")
+_after_create("""
+    CREATE MATERIALIZED VIEW public.mv_stats_by_zone AS
+    SELECT zone, count(*) AS c FROM public.social_profiles GROUP BY zone
+""")
+_after_create("CREATE UNIQUE INDEX ux_mv_stats_by_zone ON public.mv_stats_by_zone (zone)")
+_after_create("""
+    CREATE MATERIALIZED VIEW public.mv_stats_by_designation AS
+    SELECT designation, count(*) AS c FROM public.social_profiles GROUP BY designation
+""")
+_after_create("CREATE UNIQUE INDEX ux_mv_stats_by_designation "
+              "ON public.mv_stats_by_designation (designation)")
+
+# Rollup behind the filtered stats / analytics aggregate (0007_profile_rollup,
+# 0009_int4_followers).
+_after_create("""
+    CREATE MATERIALIZED VIEW public.mv_profile_rollup AS
+    SELECT
+        zone, party_district, constituency, designation,
+        coalesce(facebook_active_status OR twitter_active_status
+                 OR instagram_active_status, false)             AS any_active,
+        coalesce(facebook_verified_status OR twitter_verified_status
+                 OR instagram_verified_status, false)           AS any_verified,
+        count(*)                                                AS c,
+        count(*) FILTER (WHERE facebook_active_status)          AS fb_active,
+        count(*) FILTER (WHERE facebook_verified_status)        AS fb_verified,
+        sum(facebook_followers)                                 AS fb_followers,
+        count(facebook_followers)                               AS fb_n,
+        count(*) FILTER (WHERE twitter_active_status)           AS tw_active,
+        count(*) FILTER (WHERE twitter_verified_status)         AS tw_verified,
+        sum(twitter_followers)                                  AS tw_followers,
+        count(twitter_followers)                                AS tw_n,
+        count(*) FILTER (WHERE instagram_active_status)         AS ig_active,
+        count(*) FILTER (WHERE instagram_verified_status)       AS ig_verified,
+        sum(instagram_followers)                                AS ig_followers,
+        count(instagram_followers)                              AS ig_n,
+        sum(coalesce(facebook_followers, 0)::bigint + coalesce(twitter_followers, 0)
+            + coalesce(instagram_followers, 0))                 AS followers
+    FROM public.social_profiles
+    GROUP BY 1, 2, 3, 4, 5, 6
+""")
+_after_create("CREATE UNIQUE INDEX ux_mv_profile_rollup ON public.mv_profile_rollup "
+              "(zone, party_district, constituency, designation, any_active, any_verified)")
@@ -2,35 +2,42 @@ from pydantic import BaseModel, field_validator, model_validator, EmailStr, Fiel
 from typing import Optional
 from datetime import datetime, date
 
+# Follower counts are INTEGER columns (0009_int4_followers).
+INT4_MAX = 2_147_483_647
+
 
 # ── Shared base ────────────────────────────────────────────────────────────────
-class ProfileBase(BaseModel):
+class ProfileFields(BaseModel):
+    """Every profile field except dob and address — what the listing grid shows."""
     zone:            Optional[str] = Field(None, max_length=200)
     party_district:  Optional[str] = Field(None, max_length=200)
     constituency:    Optional[str] = Field(None, max_length=200)
     designation:     Optional[str] = Field(None, max_length=200)
     name:            Optional[str] = Field(None, max_length=500)
     whatsapp_number: Optional[str] = Field(None, max_length=50)
-    dob:             Optional[date] = None
-    address:         Optional[str] = None
     email_id:        Optional[EmailStr] = None
 
     facebook_id:               Optional[str]  = Field(None, max_length=500)
-    facebook_followers:        Optional[int]  = Field(None, ge=0)
+    facebook_followers:        Optional[int]  = Field(None, ge=0, le=INT4_MAX)
     facebook_active_status:    Optional[bool] = None
     facebook_verified_status:  Optional[bool] = None
 
     twitter_id:                Optional[str]  = Field(None, max_length=500)
-    twitter_followers:         Optional[int]  = Field(None, ge=0)
+    twitter_followers:         Optional[int]  = Field(None, ge=0, le=INT4_MAX)
     twitter_active_status:     Optional[bool] = None
     twitter_verified_status:   Optional[bool] = None
 
     instagram_id:              Optional[str]  = Field(None, max_length=500)
-    instagram_followers:       Optional[int]  = Field(None, ge=0)
+    instagram_followers:       Optional[int]  = Field(None, ge=0, le=INT4_MAX)
     instagram_active_status:   Optional[bool] = None
     instagram_verified_status: Optional[bool] = None
 
 
+class ProfileBase(ProfileFields):
+    dob:     Optional[date] = None
+    address: Optional[str] = None
+
+
 # ── Create ─────────────────────────────────────────────────────────────────────
 class ProfileCreate(ProfileBase):
     """At minimum, a profile must have a name. Social media IDs are optional."""
@@ -43,10 +50,14 @@ class ProfileCreate(ProfileBase):
 # ── Update ─────────────────────────────────────────────────────────────────────
 class ProfileUpdate(ProfileBase):
     """All fields optional — only supplied fields are patched (PATCH semantics)."""
+    # An empty name would trip ck_sp_name_len; reject it here as a 422.
+    name: Optional[str] = Field(None, min_length=1, max_length=500)
 
     @model_validator(mode="after")
     def at_least_one_field_set(self) -> "ProfileUpdate":
-        if not any(v is not None for v in self.model_dump().values()):
+        # Unset fields are None by default, so only the sent ones need a look —
+        # no model_dump() of every field.
+        if not any(getattr(self, f) is not None for f in self.model_fields_set):
             raise ValueError("At least one field must be provided for an update.")
         return self
 
@@ -54,6 +65,9 @@ class ProfileUpdate(ProfileBase):
 # ── Response ───────────────────────────────────────────────────────────────────
 class ProfileResponse(ProfileBase):
     id:         int
+    # Stored emails were validated on the way in; re-running email-validator
+    # on every response is pure overhead. EmailStr stays on create/update.
+    email_id:   Optional[str] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -61,12 +75,24 @@ class ProfileResponse(ProfileBase):
 
 
 # ── Cursor pagination ──────────────────────────────────────────────────────────
+class ProfileListItem(ProfileFields):
+    """A listing-grid row: ProfileResponse without address, dob and the
+    timestamps, which the grid never shows (the edit form fetches the full
+    record by id)."""
+    id:       int
+    email_id: Optional[str] = None  # as in ProfileResponse
+
+
 class ProfileListResponse(BaseModel):
-    rows:        list[ProfileResponse]
-    total:       int
-    next_cursor: Optional[int] = None  # None means no more pages
+    rows:        list[ProfileListItem]
+    total:       Optional[int] = None  # only computed when include_total=true
+    next_cursor: Optional[str] = None  # opaque token; None means no more pages
 
 
 # ── Bulk ops ───────────────────────────────────────────────────────────────────
 class BulkDeleteRequest(BaseModel):
-    ids: list[int] = Field(..., min_length=1, max_length=500)
\ No newline at end of file
+    ids: list[int] = Field(..., min_length=1, max_length=500)
+
+
+class BulkCreateRequest(BaseModel):
+    rows: list[ProfileCreate] = Field(..., min_length=1, max_length=5000)
\ No newline at end of file
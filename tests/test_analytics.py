@@ -0,0 +1,31 @@
+from starlette.requests import Request
+
+from main import _json_bytes_response
+
+
+def make_request(**headers):
+    raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_json_bytes_response_sets_etag():
+    resp = _json_bytes_response(b'{"a":1}', make_request())
+    assert resp.status_code == 200
+    assert resp.body == b'{"a":1}'
+    assert resp.headers["etag"].startswith('W/"')
+
+
+def test_matching_if_none_match_returns_empty_304():
+    etag = _json_bytes_response(b'{"a":1}', make_request()).headers["etag"]
+
+    resp = _json_bytes_response(b'{"a":1}', make_request(if_none_match=f'"x", {etag}'))
+    assert resp.status_code == 304
+    assert resp.body == b""
+    assert resp.headers["etag"] == etag
+
+    # weak comparison: the strong form of the same tag matches too
+    resp = _json_bytes_response(b'{"a":1}', make_request(if_none_match=etag.removeprefix("W/")))
+    assert resp.status_code == 304
+
+    resp = _json_bytes_response(b'{"a":2}', make_request(if_none_match=etag))
+    assert resp.status_code == 200
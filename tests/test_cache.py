@@ -0,0 +1,130 @@
+import asyncio
+import time
+
+import pytest
+
+import cache
+
+
+@pytest.fixture(autouse=True)
+def no_redis(monkeypatch):
+    # Force the "Redis down" path so only the in-process layers are exercised.
+    monkeypatch.setattr(cache, "_redis_pool", None)
+    monkeypatch.setattr(cache, "_last_failed", time.monotonic())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_call():
+    calls = 0
+
+    @cache.cache_response(prefix="t_single_flight", ttl=30)
+    async def endpoint(a: int = 1, db=None):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"a": a}
+
+    results = await asyncio.gather(*[endpoint(a=1, db=object()) for _ in range(10)])
+    assert calls == 1
+    assert all(r == {"a": 1} for r in results)
+
+
+@pytest.mark.asyncio
+async def test_leader_exception_reaches_all_waiters():
+    @cache.cache_response(prefix="t_single_flight_err", ttl=30)
+    async def endpoint(a: int = 1):
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(*[endpoint(a=1) for _ in range(3)], return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_invalidate_prefix_drops_l1():
+    calls = 0
+
+    @cache.cache_response(prefix="t_l1", ttl=30)
+    async def endpoint(a: int = 1):
+        nonlocal calls
+        calls += 1
+        return {"a": a}
+
+    await endpoint(a=1)
+    await endpoint(a=1)
+    assert calls == 1
+
+    await cache.invalidate_prefix("t_l1")
+    await endpoint(a=1)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_use_l1_serves_cache_get_until_invalidated():
+    cache.use_l1("t_l1_get", ttl=30)
+
+    await cache.cache_set("t_l1_get:all", b"payload", ttl=30)
+    assert await cache.cache_get("t_l1_get:all") == b"payload"
+
+    await cache.invalidate_prefix("t_l1_get")
+    assert await cache.cache_get("t_l1_get:all") is None
+
+
+class _FakePipeline:
+    def __init__(self, store):
+        self.store = store
+        self.ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def setex(self, key, ttl, blob):
+        self.ops.append((key, blob))
+
+    def sadd(self, *args):
+        pass
+
+    def expire(self, *args):
+        pass
+
+    async def execute(self):
+        self.store.update(self.ops)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.gets = 0
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self.store)
+
+    async def get(self, key):
+        self.gets += 1
+        return self.store.get(key)
+
+
+@pytest.mark.asyncio
+async def test_set_then_get_is_served_from_l1_while_tracking(monkeypatch):
+    pool, writer = _FakeRedis(), _FakeRedis()
+    monkeypatch.setattr(cache, "_redis_pool", pool)
+    monkeypatch.setattr(cache, "_last_failed", 0.0)
+    monkeypatch.setattr(cache, "_writer", writer)
+    # As set by the L1 listener once tracking is on.
+    monkeypatch.setattr(cache, "_tracking_redirect", 1)
+    cache.use_l1("t_l1_track", ttl=30)
+
+    await cache.cache_set("t_l1_track:all", b"payload", ttl=30)
+    # The fill goes out on the NOLOOP writer, so Redis doesn't echo it back
+    # as an invalidation of the entry just stored.
+    assert "t_l1_track:all" in writer.store and not pool.store
+
+    assert await cache.cache_get("t_l1_track:all") == b"payload"
+    assert pool.gets == 0
+
+    # Keys without an L1 don't queue behind the single tracking connection.
+    await cache.cache_set("t_no_l1:all", b"payload", ttl=30)
+    assert "t_no_l1:all" in pool.store and "t_no_l1:all" not in writer.store
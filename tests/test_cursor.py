@@ -0,0 +1,22 @@
+import pytest
+from fastapi import HTTPException
+
+from main import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("facebook_followers", 120, 5), "facebook_followers") == (120, 5)
+    assert decode_cursor(encode_cursor("name", None, 7), "name") == (None, 7)
+
+
+@pytest.mark.parametrize("sort_by,value,row_id", [
+    ("facebook_followers", "abc", 5),
+    ("facebook_followers", 2**40, 5),
+    ("id", None, 5),
+    ("name", 3, 5),
+    ("name", "Ram", 2**40),
+])
+def test_cursor_value_must_fit_sort_column(sort_by, value, row_id):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(encode_cursor(sort_by, value, row_id), sort_by)
+    assert exc.value.status_code == 400
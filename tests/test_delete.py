@@ -10,18 +10,23 @@ class FakeProfile:
         self.name = name
 
 
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def one_or_none(self):
+        return self.row
+
+
 class FakeSession:
     def __init__(self, store=None):
         # store is a dict id->FakeProfile
         self.store = store or {}
 
-    async def get(self, model, id):
-        return self.store.get(id)
-
-    async def delete(self, obj):
-        # emulate SQLAlchemy delete semantics by removing from store
-        if obj.id in self.store:
-            del self.store[obj.id]
+    async def execute(self, stmt):
+        # emulate DELETE ... WHERE id = :id RETURNING name against the store
+        (pid,) = stmt.compile().params.values()
+        return FakeResult(self.store.pop(pid, None))
 
     async def commit(self):
         return None
@@ -59,3 +64,22 @@ async def test_delete_success_removes_profile():
     assert isinstance(res, dict)
     assert res.get("message") == "Deleted"
     assert 123 not in store
+
+
+@pytest.mark.asyncio
+async def test_delete_signed_id_is_parsed():
+    store = {5: FakeProfile(5, name="Eve")}
+    db = FakeSession(store)
+    res = await delete_profile("+5", db)
+    assert res.get("message") == "Deleted"
+    with pytest.raises(HTTPException) as exc:
+        await delete_profile("-5", db)
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_delete_out_of_range_id_returns_404():
+    db = FakeSession()
+    with pytest.raises(HTTPException) as exc:
+        await delete_profile("99999999999", db)
+    assert exc.value.status_code == 404
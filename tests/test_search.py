@@ -0,0 +1,22 @@
+from sqlalchemy.dialects import postgresql
+
+from main import _build_search_filter
+
+
+def _compiled(search):
+    return _build_search_filter(search).compile(dialect=postgresql.dialect())
+
+
+def test_search_keeps_substring_match_on_word_columns():
+    for search in ("esh", "राम कुमार", "O'Brien"):
+        compiled = _compiled(search)
+        assert "social_profiles.name ILIKE" in str(compiled)
+        assert "social_profiles.zone ILIKE" in str(compiled)
+        assert f"%{search}%" in compiled.params.values()
+
+
+def test_multi_word_search_is_tokenized_by_postgres():
+    compiled = _compiled("राम कुमार")
+    assert "plainto_tsquery" in str(compiled)
+    assert "राम कुमार" in compiled.params.values()
+    assert "plainto_tsquery" not in str(_compiled("ramesh"))